@@ -0,0 +1,27 @@
+-- Partial indexes backing the resource_cleanup.py candidate query:
+--   WHERE created_time < $cutoff AND first_time_not_seen IS NULL
+-- Only live rows are indexed, so the range scan on created_time never touches
+-- resources that have already been seen as deleted.
+-- CONCURRENTLY keeps the tables writable while the indexes are built on an
+-- existing database; run this file outside of an explicit transaction.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_servers_cleanup
+    ON servers (created_time)
+    WHERE first_time_not_seen IS NULL;
+
+-- resource_name is included so the protected-name filter is answered from the index
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_networks_cleanup
+    ON networks (created_time) INCLUDE (resource_name)
+    WHERE first_time_not_seen IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_subnets_cleanup
+    ON subnets (created_time) INCLUDE (resource_name)
+    WHERE first_time_not_seen IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_routers_cleanup
+    ON routers (created_time)
+    WHERE first_time_not_seen IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_floating_ips_cleanup
+    ON floating_ips (created_time)
+    WHERE first_time_not_seen IS NULL;
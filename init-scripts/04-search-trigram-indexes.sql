@@ -0,0 +1,27 @@
+-- Trigram indexes backing the resource_search.py name search:
+--   WHERE resource_name LIKE '%substr%' [AND resource_name LIKE '%substr%' ...]
+-- A leading wildcard can't use a btree index, so without these every search is
+-- a sequential scan of each table. pg_trgm's GIN operator class lets the
+-- planner answer infix LIKE patterns from the index instead.
+-- CONCURRENTLY keeps the tables writable while the indexes are built on an
+-- existing database; run this file outside of an explicit transaction.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_servers_name_trgm
+    ON servers USING gin (resource_name gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_networks_name_trgm
+    ON networks USING gin (resource_name gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_routers_name_trgm
+    ON routers USING gin (resource_name gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_subnets_name_trgm
+    ON subnets USING gin (resource_name gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_gpu_leases_name_trgm
+    ON gpu_leases USING gin (lease_name gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_floating_ips_name_trgm
+    ON floating_ips USING gin (resource_name gin_trgm_ops);
@@ -0,0 +1,26 @@
+-- Btree indexes backing resource_search.py --prefix searches:
+--   WHERE resource_name LIKE 'prefix%'
+-- text_pattern_ops compares character by character regardless of the database
+-- collation, which is what lets the planner turn an anchored LIKE into an index
+-- range scan. These are much cheaper to maintain than the trigram indexes in
+-- 04-search-trigram-indexes.sql, which are still needed for infix searches.
+-- CONCURRENTLY keeps the tables writable while the indexes are built on an
+-- existing database; run this file outside of an explicit transaction.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_servers_name_pattern
+    ON servers (resource_name text_pattern_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_networks_name_pattern
+    ON networks (resource_name text_pattern_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_routers_name_pattern
+    ON routers (resource_name text_pattern_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_subnets_name_pattern
+    ON subnets (resource_name text_pattern_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_gpu_leases_name_pattern
+    ON gpu_leases (lease_name text_pattern_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_floating_ips_name_pattern
+    ON floating_ips (resource_name text_pattern_ops);
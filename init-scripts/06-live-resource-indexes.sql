@@ -0,0 +1,32 @@
+-- Partial indexes backing the tracker's missing-resource check:
+--   UPDATE <table> SET first_time_not_seen = ...
+--   WHERE project_site = $site AND first_time_not_seen IS NULL
+--   AND last_seen_time < $sync_time
+-- Only live rows are indexed, so each sync scans the site's live resources
+-- that were not seen this run instead of every row the table has ever recorded.
+-- CONCURRENTLY keeps the tables writable while the indexes are built on an
+-- existing database; run this file outside of an explicit transaction.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_servers_live
+    ON servers (project_site, last_seen_time)
+    WHERE first_time_not_seen IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_networks_live
+    ON networks (project_site, last_seen_time)
+    WHERE first_time_not_seen IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_routers_live
+    ON routers (project_site, last_seen_time)
+    WHERE first_time_not_seen IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_subnets_live
+    ON subnets (project_site, last_seen_time)
+    WHERE first_time_not_seen IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_floating_ips_live
+    ON floating_ips (project_site, last_seen_time)
+    WHERE first_time_not_seen IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_gpu_leases_live
+    ON gpu_leases (project_site, last_seen_time)
+    WHERE first_time_not_seen IS NULL;
@@ -0,0 +1,40 @@
+-- Word-level name search for resource_search.py multi-word terms:
+--   WHERE name_tsv @@ plainto_tsquery('simple', 'prod api')
+-- name_tsv holds the name's words with '-' and '_' treated as separators, so a
+-- query for "prod api" matches prod-api-router, which neither LIKE nor the
+-- trigram indexes can express. The 'simple' configuration does no stemming
+-- or stop-word removal, which suits resource names.
+-- Generated columns need PostgreSQL 12 or newer. Adding a stored column
+-- rewrites the table; the indexes are then built CONCURRENTLY, so run this
+-- file outside of an explicit transaction.
+
+ALTER TABLE servers ADD COLUMN IF NOT EXISTS name_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', translate(resource_name, '-_', '  '))) STORED;
+ALTER TABLE networks ADD COLUMN IF NOT EXISTS name_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', translate(resource_name, '-_', '  '))) STORED;
+ALTER TABLE routers ADD COLUMN IF NOT EXISTS name_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', translate(resource_name, '-_', '  '))) STORED;
+ALTER TABLE subnets ADD COLUMN IF NOT EXISTS name_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', translate(resource_name, '-_', '  '))) STORED;
+ALTER TABLE gpu_leases ADD COLUMN IF NOT EXISTS name_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', translate(lease_name, '-_', '  '))) STORED;
+ALTER TABLE floating_ips ADD COLUMN IF NOT EXISTS name_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', translate(resource_name, '-_', '  '))) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_servers_name_tsv
+    ON servers USING gin (name_tsv);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_networks_name_tsv
+    ON networks USING gin (name_tsv);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_routers_name_tsv
+    ON routers USING gin (name_tsv);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_subnets_name_tsv
+    ON subnets USING gin (name_tsv);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_gpu_leases_name_tsv
+    ON gpu_leases USING gin (name_tsv);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_floating_ips_name_tsv
+    ON floating_ips USING gin (name_tsv);
@@ -0,0 +1,19 @@
+BEGIN;
+
+-- floating_ips was created without a primary key, so resource_tracker.py could
+-- not upsert it with ON CONFLICT (resource_id) like the other resource tables.
+-- Drop any duplicate rows first (keeping the most recently seen copy), then
+-- add the key.
+DELETE FROM floating_ips a
+    USING floating_ips b
+    WHERE a.resource_id = b.resource_id
+    AND (a.last_seen_time, a.ctid) < (b.last_seen_time, b.ctid);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'floating_ips_pkey') THEN
+        ALTER TABLE floating_ips ADD CONSTRAINT floating_ips_pkey PRIMARY KEY (resource_id);
+    END IF;
+END $$;
+
+COMMIT;
@@ -1,217 +1,355 @@
 #!/usr/bin/env python3
 
 import argparse
+import atexit
 import logging
-import os
 import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 import openstack
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from typing import Dict, List, Any
+import psycopg2.pool
+from psycopg2 import sql
+from typing import Dict, List, Any, Callable, Optional, Tuple
 from dotenv import load_dotenv
-from keystoneauth1.identity import v3
-from keystoneauth1 import session
 from openstack import connection
 from tabulate import tabulate
+from resource_common import configure_logging, create_session, get_db_params, get_project_site, parse_credentials
 
 # Load environment variables
 load_dotenv()
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('resource_cleanup.log'),
-        logging.StreamHandler()
-    ]
-)
+configure_logging('resource_cleanup.log')
 logger = logging.getLogger(__name__)
 
+# Number of concurrent OpenStack delete calls issued within a single phase
+DEFAULT_DELETE_CONCURRENCY = 8
+MAX_DELETE_CONCURRENCY = 10
+
+# Database access is serial (candidate listing, then the final status
+# update); the delete threads only talk to OpenStack
+DB_POOL_MAX_CONNECTIONS = 2
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Rows fetched per round-trip when streaming cleanup candidates
+CURSOR_ITERSIZE = 1000
+
+# Network IDs per Neutron port-list request when collecting ports to delete
+PORT_FILTER_BATCH_SIZE = 100
+
+# Table-specific columns returned alongside the common ones for each cleanup
+# candidate. Only what display_resources and delete_resources actually use is
+# selected, so the wide JSONB columns never leave the database. Every candidate
+# row carries all DETAIL_COLUMNS; tables without a column select NULL for it.
+DETAIL_COLUMNS = ('flavor', 'cidr', 'description')
+CLEANUP_DETAIL_COLUMNS = {
+    'servers': ('flavor',),
+    'networks': (),
+    'subnets': ('cidr',),
+    'routers': (),
+    'floating_ips': ('description',),
+}
+
+# Resource-specific column shown in the Details column: (label, attribute)
+DISPLAY_DETAILS = {
+    'servers': ('Flavor', 'flavor'),
+    'subnets': ('CIDR', 'cidr'),
+    'floating_ips': ('Description', 'description')
+}
+
+# Infrastructure that must never be cleaned up, by resource name
+PROTECTED_RESOURCES = {
+    'networks': ('public', 'sharednet1'),
+    'subnets': ('sharednet1-subnet',)
+}
+
+
+def _candidate_select(table: str) -> str:
+    """SELECT for one table's cleanup candidates, in the shared candidate row shape"""
+    details = ", ".join(
+        col if col in CLEANUP_DETAIL_COLUMNS[table] else f"NULL::varchar AS {col}"
+        for col in DETAIL_COLUMNS
+    )
+    name_condition = f"AND resource_name <> ALL(%(protected_{table})s)" if table in PROTECTED_RESOURCES else ""
+    return f"""
+        SELECT
+            '{table}' AS resource_type,
+            resource_id, resource_name, status, created_time,
+            last_seen_time, project_site,
+            EXTRACT(EPOCH FROM (LOCALTIMESTAMP - created_time))::bigint AS age_seconds,
+            {details}
+        FROM {table}
+        WHERE '{table}' = ANY(%(resource_types)s)
+        AND created_time < %(cutoff_time)s
+        AND first_time_not_seen IS NULL
+        AND (%(project_site)s IS NULL OR project_site = %(project_site)s)
+        {name_condition}
+    """
+
+
+# One UNION ALL over every table, built once at import. Branches for tables
+# that were not requested reduce to a constant-false filter, so each run only
+# binds parameters and all candidates come back in a single round-trip.
+# Each branch's "created_time < cutoff AND first_time_not_seen IS NULL" filter
+# is served by the partial idx_<table>_cleanup indexes from
+# init-scripts/03-cleanup-indexes.sql; without them every run seq-scans.
+CLEANUP_CANDIDATES_SQL = (
+    " UNION ALL ".join(_candidate_select(table) for table in CLEANUP_DETAIL_COLUMNS)
+    + " ORDER BY created_time ASC"
+)
+
+@dataclass
+class CleanupCandidate:
+    """A resource selected for cleanup; field order matches the candidate SELECT"""
+    # Written out rather than dataclass(slots=True), which needs Python 3.10
+    __slots__ = ('resource_type', 'resource_id', 'resource_name', 'status', 'created_time',
+                 'last_seen_time', 'project_site', 'age_seconds', 'flavor', 'cidr', 'description')
+    resource_type: str
+    resource_id: str
+    resource_name: str
+    status: str
+    created_time: datetime
+    last_seen_time: datetime
+    project_site: str
+    age_seconds: int
+    flavor: Optional[str]
+    cidr: Optional[str]
+    description: Optional[str]
+
 class ResourceCleaner:
-    def __init__(self):
-        self.db_params = {
-            'dbname': os.getenv('DB_NAME'),
-            'user': os.getenv('DB_USER'),
-            'password': os.getenv('DB_PASSWORD'),
-            'host': os.getenv('DB_HOST'),
-            'port': os.getenv('DB_PORT')
-        }
+    def __init__(self, delete_concurrency: int = DEFAULT_DELETE_CONCURRENCY):
+        self.db_params = get_db_params()
+
+        self.delete_concurrency = max(1, min(delete_concurrency, MAX_DELETE_CONCURRENCY))
+
+        self.pg_pool = psycopg2.pool.ThreadedConnectionPool(
+            minconn=1, maxconn=DB_POOL_MAX_CONNECTIONS, **self.db_params
+        )
+        atexit.register(self.pg_pool.closeall)
 
         self.os_connections = {}
         self.initialize_connections()
 
-        self.protected_resources = {
-            'networks': ['public', 'sharednet1'],
-            'subnets': ['sharednet1-subnet']
-        }
+        # Converted to lists once so each binds as a single array parameter
+        # for '<> ALL(%s)'
+        self.protected_resources = {table: list(names) for table, names in PROTECTED_RESOURCES.items()}
 
-    def get_project_site(self, auth_url: str) -> str:
-        """Determine the project_site based on the auth_url."""
-        if 'kvm.tacc.chameleoncloud.org' in auth_url:
-            return 'kvm@tacc'
-        elif 'chi.tacc.chameleoncloud.org' in auth_url:
-            return 'chi@tacc'
-        elif 'chi.uc.chameleoncloud.org' in auth_url:
-            return 'chi@uc'
-        else:
-            raise ValueError(f"Unknown auth_url: {auth_url}")
-    
     def initialize_connections(self):
         """Initialize connections for all project sites"""
-        # Parse OpenStack credentials
-        auth_urls = os.getenv('OS_AUTH_URL', '').split(',')
-        app_cred_ids = os.getenv('OS_APPLICATION_CREDENTIAL_ID', '').split(',')
-        app_cred_secrets = os.getenv('OS_APPLICATION_CREDENTIAL_SECRET', '').split(',')
-
-        # Initialize OpenStack connections
-        for auth_url, cred_id, secret in zip(auth_urls, app_cred_ids, app_cred_secrets):
-            auth_url = auth_url.strip()
-            cred_id = cred_id.strip()
-            secret = secret.strip()
-            
-            project_site = self.get_project_site(auth_url)
-            
-            auth = v3.ApplicationCredential(
-                auth_url=auth_url,
-                application_credential_id=cred_id,
-                application_credential_secret=secret
-            )
-            sess = session.Session(auth=auth)
+        for auth_url, cred_id, secret in parse_credentials('OS'):
+            project_site = get_project_site(auth_url)
+            sess = create_session(auth_url, cred_id, secret)
             self.os_connections[project_site] = connection.Connection(session=sess)
-        
-    def get_resources_to_delete(self, hours: int, resource_type: List[str], project_site: str = None) -> Dict[str, List[Dict]]:
+
+    @contextmanager
+    def _get_conn(self):
+        """Borrow a pooled connection, committing on success and rolling back on error"""
+        conn = self.pg_pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pg_pool.putconn(conn)
+
+    def get_resources_to_delete(self, hours: int, resource_type: List[str], project_site: str = None) -> Dict[str, List[CleanupCandidate]]:
         """Get resources older than specified hours that are still active"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        site_condition = "AND project_site = %s" if project_site else ""
+        resources = {table: [] for table in resource_type}
+        if not resources:
+            return resources
+
+        query_params = {
+            'cutoff_time': datetime.now() - timedelta(hours=hours),
+            'project_site': project_site,
+            'resource_types': list(resources),
+        }
+        for table, names in self.protected_resources.items():
+            query_params[f'protected_{table}'] = names
 
         try:
-            with psycopg2.connect(**self.db_params) as conn:
-                with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                    resources = {}
-                    
-                    query_params = [cutoff_time]
-                    if project_site:
-                        query_params.append(project_site)
-                    
-                    # Servers query - this was missing before
-                    if 'servers' in resource_type:
-                        cur.execute(f"""
-                            SELECT 
-                                resource_id, resource_name, status, created_time,
-                                updated_time, last_seen_time, first_time_not_seen,
-                                flavor, image, security_groups, addresses, project_site
-                            FROM servers
-                            WHERE created_time < %s
-                            AND first_time_not_seen IS NULL
-                            {site_condition}
-                            ORDER BY created_time ASC
-                        """, query_params)
-                        resources['servers'] = cur.fetchall()
-                        logger.debug(f"Found {len(resources['servers'])} servers to delete")
-
-                # Networks query
-                    if 'networks' in resource_type:
-                        network_params = query_params + [tuple(self.protected_resources['networks'])]
-                        cur.execute(f"""
-                            SELECT 
-                                resource_id, resource_name, status, created_time,
-                                updated_time, last_seen_time, first_time_not_seen,
-                                port_security_enabled, project_site
-                            FROM networks
-                            WHERE created_time < %s
-                            AND first_time_not_seen IS NULL
-                            {site_condition}
-                            AND resource_name NOT IN %s
-                            ORDER BY created_time ASC
-                        """, network_params)
-                        resources['networks'] = cur.fetchall()
-                    
-                    # Subnets query
-                    if 'subnets' in resource_type:
-                        subnet_params = query_params + [tuple(self.protected_resources['subnets'])]
-                        cur.execute(f"""
-                            SELECT 
-                                resource_id, resource_name, status, created_time,
-                                updated_time, last_seen_time, first_time_not_seen,
-                                network_id, allocation_pools, cidr, project_site
-                            FROM subnets
-                            WHERE created_time < %s
-                            AND first_time_not_seen IS NULL
-                            {site_condition}
-                            AND resource_name NOT IN %s
-                            ORDER BY created_time ASC
-                        """, subnet_params)
-                        resources['subnets'] = cur.fetchall()
-                    
-                    # Routers query
-                    if 'routers' in resource_type:
-                        cur.execute(f"""
-                            SELECT 
-                                resource_id, resource_name, status, created_time,
-                                updated_time, last_seen_time, first_time_not_seen,
-                                external_gateway_info, project_site
-                            FROM routers
-                            WHERE created_time < %s
-                            AND first_time_not_seen IS NULL
-                            {site_condition}
-                            ORDER BY created_time ASC
-                        """, query_params)
-                        resources['routers'] = cur.fetchall()
-                    
-                    # Floating IPs query
-                    if 'floating_ips' in resource_type:
-                        cur.execute(f"""
-                            SELECT 
-                                resource_id, resource_name, status, created_time,
-                                updated_time, last_seen_time, first_time_not_seen,
-                                description, floating_ip_address, fixed_ip_address, project_site
-                            FROM floating_ips
-                            WHERE created_time < %s
-                            AND first_time_not_seen IS NULL
-                            {site_condition}
-                            ORDER BY created_time ASC
-                        """, query_params)
-                        resources['floating_ips'] = cur.fetchall()
+            with self._get_conn() as conn:
+                # Server-side cursor: rows are streamed in CURSOR_ITERSIZE
+                # batches instead of being buffered client-side by fetchall()
+                with conn.cursor(name='cleanup_candidates') as cur:
+                    cur.itersize = CURSOR_ITERSIZE
+                    cur.execute(CLEANUP_CANDIDATES_SQL, query_params)
+                    for row in cur:
+                        candidate = CleanupCandidate(*row)
+                        resources[candidate.resource_type].append(candidate)
+
+            for table, items in resources.items():
+                logger.debug("Found %d %s to delete", len(items), table)
             return resources
             
         except Exception as e:
-            logger.error(f"Database error: {str(e)}")
+            logger.error("Database error: %s", e)
             raise
 
-    def display_resources(self, resources: Dict[str, List[Dict]]):
+    def display_resources(self, resources: Dict[str, List[CleanupCandidate]]):
         """Display given resources using tabulate"""
+        headers = ['Name', 'Status', 'Created', 'Age', 'Last Seen', 'Project Site', 'Details']
+        # Box-drawing only helps a human at a terminal; plain is much cheaper
+        # to render when output is redirected to a file or log
+        tablefmt = 'grid' if sys.stdout.isatty() else 'plain'
+
         for resource_type, items in resources.items():
             if items:
                 print(f"\n{resource_type.upper()} to be deleted:")
-                table_data = []
-                for item in items:
-                    age = datetime.now() - item['created_time']
-                    row = [
-                        item['resource_name'],
-                        item['status'],
-                        item['created_time'].strftime('%Y-%m-%d %H:%M:%S'),
-                        f"{age.days}d {age.seconds//3600}h",
-                        item['last_seen_time'].strftime('%Y-%m-%d %H:%M:%S'),
-                        item['project_site']
-                    ]
-                    
-                    # Add resource-specific information
-                    if resource_type == 'servers':
-                        row.append(f"Flavor: {item['flavor']}")
-                    elif resource_type == 'subnets':
-                        row.append(f"CIDR: {item['cidr']}")
-                    elif resource_type == 'floating_ips':
-                        row.append(f"Description: {item['description']}")
-                    
-                    table_data.append(row)
-
-                headers = ['Name', 'Status', 'Created', 'Age', 'Last Seen', 'Project Site', 'Details']
-                print(tabulate(table_data, headers=headers, tablefmt='grid'))
-
-    def delete_resources(self, resources: Dict[str, List[Dict]], dry_run: bool = True):
+                detail = DISPLAY_DETAILS.get(resource_type)
+                table_data = [
+                    [
+                        item.resource_name,
+                        item.status,
+                        item.created_time.strftime(TIMESTAMP_FORMAT),
+                        f"{item.age_seconds // 86400}d {item.age_seconds % 86400 // 3600}h",
+                        item.last_seen_time.strftime(TIMESTAMP_FORMAT),
+                        item.project_site
+                    ] + ([f"{detail[0]}: {getattr(item, detail[1])}"] if detail else [])
+                    for item in items
+                ]
+                print(tabulate(table_data, headers=headers, tablefmt=tablefmt))
+
+    def _list_network_ports(self, os_conn, network_ids: List[str]) -> List[Any]:
+        """List the ports on the given networks, filtered server-side by Neutron.
+
+        network_id is passed as a multi-valued filter, in batches so the
+        query string stays within URL length limits.
+        """
+        ports = []
+        for i in range(0, len(network_ids), PORT_FILTER_BATCH_SIZE):
+            ports.extend(os_conn.network.ports(network_id=network_ids[i:i + PORT_FILTER_BATCH_SIZE]))
+        return ports
+
+    def _run_phase(self, site: str, label: str, delete_fn: Callable[[Any, Any], Tuple[str, bool]], os_conn, items: List[Any]) -> List[str]:
+        """Run delete_fn concurrently over items and return the IDs that were deleted.
+
+        Per-item successes are only logged at DEBUG; one summary line per
+        phase is logged at INFO, and failures are still logged individually.
+        """
+        deleted_ids = []
+        with ThreadPoolExecutor(max_workers=self.delete_concurrency) as pool:
+            futures = [pool.submit(delete_fn, os_conn, item) for item in items]
+            for future in as_completed(futures):
+                resource_id, ok = future.result()
+                if ok:
+                    deleted_ids.append(resource_id)
+        logger.info("Deleted %d/%d %s on %s", len(deleted_ids), len(items), label, site)
+        return deleted_ids
+
+    def _delete_server(self, os_conn, server) -> Tuple[str, bool]:
+        """Delete a single server"""
+        server_id = server.resource_id
+        try:
+            os_conn.compute.delete_server(server_id)
+            logger.debug("Deleted server: %s (%s)", server.resource_name, server_id)
+            return server_id, True
+        except Exception as e:
+            logger.error("Error deleting server %s: %s", server_id, e)
+            return server_id, False
+
+    def _delete_port(self, os_conn, port) -> Tuple[str, bool]:
+        """Delete a single port left on a network that is about to be deleted"""
+        try:
+            os_conn.network.delete_port(port=port.id, ignore_missing=False)
+            logger.debug("Deleted port %s on network: %s", port.id, port.network_id)
+            return port.id, True
+        except Exception as e:
+            logger.error("Error deleting port %s on network %s: %s", port.id, port.network_id, e)
+            return port.id, False
+
+    def _delete_subnet(self, os_conn, subnet) -> Tuple[str, bool]:
+        """Delete a single subnet"""
+        subnet_id = subnet.resource_id
+        try:
+            os_conn.network.delete_subnet(subnet_id)
+            logger.debug("Deleted subnet: %s (%s)", subnet.resource_name, subnet.cidr)
+            return subnet_id, True
+        except Exception as e:
+            logger.error("Error deleting subnet %s: %s", subnet_id, e)
+            return subnet_id, False
+
+    def _delete_network(self, os_conn, network) -> Tuple[str, bool]:
+        """Delete a single network"""
+        network_id = network.resource_id
+        try:
+            os_conn.network.delete_network(network_id)
+            logger.debug("Deleted network: %s (%s)", network.resource_name, network_id)
+            return network_id, True
+        except Exception as e:
+            logger.error("Error deleting network %s: %s", network_id, e)
+            return network_id, False
+
+    def _delete_floating_ip(self, os_conn, ip) -> Tuple[str, bool]:
+        """Delete a single floating IP"""
+        ip_id = ip.resource_id
+        try:
+            os_conn.network.delete_ip(ip_id)
+            logger.debug("Deleted floating ip: %s (%s)", ip.resource_name, ip_id)
+            return ip_id, True
+        except Exception as e:
+            logger.error("Error deleting floating ip %s: %s", ip_id, e)
+            return ip_id, False
+
+    def _delete_site(self, site: str, site_resources: Dict[str, List[CleanupCandidate]]) -> Dict[str, List[str]]:
+        """Delete one site's resources in dependency order and return the deleted IDs by type"""
+        deleted = defaultdict(list)
+        os_conn = self.os_connections.get(site)
+        if not os_conn:
+            logger.error("No connection available for site %s", site)
+            return deleted
+
+        # A failure part-way through a site must not lose the IDs already
+        # deleted from OpenStack: they are returned so delete_resources can
+        # still mark them system_deleted
+        try:
+            # Authenticate once before the phases fan deletes out over threads;
+            # the auth plugin caches the token for the concurrent requests
+            os_conn.session.get_token()
+
+            # 1. Delete servers first
+            if site_resources.get('servers'):
+                deleted['servers'] = self._run_phase(site, 'servers', self._delete_server, os_conn, site_resources['servers'])
+
+            # 2. Delete Ports on the networks. If they can't be listed, the
+            # networks still holding ports fail to delete and are logged below
+            if site_resources.get('networks'):
+                try:
+                    network_ports = self._list_network_ports(
+                        os_conn, [network.resource_id for network in site_resources['networks']])
+                except Exception as e:
+                    logger.error("Error listing ports on %s: %s", site, e)
+                    network_ports = []
+                self._run_phase(site, 'ports', self._delete_port, os_conn, network_ports)
+
+            # 3. Delete subnets
+            if site_resources.get('subnets'):
+                deleted['subnets'] = self._run_phase(site, 'subnets', self._delete_subnet, os_conn, site_resources['subnets'])
+
+            # 4. Delete networks
+            if site_resources.get('networks'):
+                deleted['networks'] = self._run_phase(site, 'networks', self._delete_network, os_conn, site_resources['networks'])
+
+            # 5. Delete Floating IPs
+            if site_resources.get('floating_ips'):
+                deleted['floating_ips'] = self._run_phase(site, 'floating ips', self._delete_floating_ip, os_conn, site_resources['floating_ips'])
+        except Exception:
+            logger.exception("Error deleting resources on %s, skipping the rest of the site", site)
+
+        return deleted
+
+    def delete_resources(self, resources: Dict[str, List[CleanupCandidate]], dry_run: bool = True):
         """Delete the specified resources in the correct order"""
+        if not any(resources.values()):
+            logger.info("No resources matched the cleanup criteria")
+            return
+
         if dry_run:
             logger.info("DRY RUN - No resources will be deleted")
             self.display_resources(resources)
@@ -228,105 +366,44 @@ class ResourceCleaner:
 
         try:
 
-            # Group resources by project site
-            resources_by_site = {}
+            # Group resources by project site; only non-empty types get a key,
+            # so phases with nothing to do are skipped without any API call
+            resources_by_site = defaultdict(lambda: defaultdict(list))
             for resource_type, items in resources.items():
                 for item in items:
-                    site = item['project_site']
-                    if site not in resources_by_site:
-                        resources_by_site[site] = {
-                            'servers': [], 'routers': [], 'subnets': [],
-                            'networks': [], 'floating_ips': []
-                        }
-                    resources_by_site[site][resource_type].append(item)
-            
-            for site, site_resources in resources_by_site.items():
-                os_conn = self.os_connections.get(site)
-                if not os_conn:
-                    logger.error(f"No connection available for site {site}")
-                    continue
-            
-                # 1. Delete servers first
-                if site_resources['servers']:
-                    for server in site_resources['servers']:
-                        try:
-                            server_id = server['resource_id']
-                            logger.info(f"Deleting server: {server['resource_name']} ({server['status']})")
-                            os_conn.compute.delete_server(server_id)
-                            deleted_resources['servers'].append(server_id)
-                            logger.info(f"Deleted server: {server_id}")
-                        except Exception as e:
-                            logger.error(f"Error deleting server {server_id}: {str(e)}")
-                            continue
-
-                # 2. Delete Ports on the networks
-                if site_resources['networks']:
-                    for network in site_resources['networks']:
-                        try:
-                            network_id = network['resource_id']
-                            logger.info(f"Deleting port on network: {network['resource_name']}")
-                            ports = self.os_conn.network.ports(network_id=network_id)
-                            for port in ports:
-                                self.os_conn.network.delete_port(port=port.id, ignore_missing=False)
-                                logger.info(f"Deleted port {port.id} on network : {network_id}")
-                        except Exception as e:
-                            logger.error(f"Error deleting port {port.id} on network {network_id}: {str(e)}")
-                            continue
-
-                # 3. Delete subnets
-                if site_resources['subnets']:
-                    for subnet in site_resources['subnets']:
-                        try:
-                            subnet_id = subnet['resource_id']
-                            logger.info(f"Deleting subnet: {subnet['resource_name']} ({subnet['cidr']})")
-                            os_conn.network.delete_subnet(subnet_id)
-                            deleted_resources['subnets'].append(subnet_id)
-                            logger.info(f"Deleted subnet: {subnet_id}")
-                        except Exception as e:
-                            logger.error(f"Error deleting subnet {subnet_id}: {str(e)}")
-                            continue
-
-                # 4. Delete networks
-                if site_resources['networks']:
-                    for network in site_resources['networks']:
-                        try:
-                            network_id = network['resource_id']
-                            logger.info(f"Deleting network: {network['resource_name']} ({network['status']})")
-                            os_conn.network.delete_network(network_id)
-                            deleted_resources['networks'].append(network_id)
-                            logger.info(f"Deleted network: {network_id}")
-                        except Exception as e:
-                            logger.error(f"Error deleting network {network_id}: {str(e)}")
-                            continue
-
-                # 5. Delete Floating IPs
-                if site_resources['floating_ips']:
-                    for ip in site_resources['floating_ips']:
-                        try:
-                            ip_id = ip['resource_id']
-                            logger.info(f"Deleting floating ip: {ip['resource_name']}")
-                            os_conn.network.delete_ip(ip_id)
-                            deleted_resources['floating_ips'].append(ip_id)
-                            logger.info(f"Deleted floating ip: {ip['resource_name']}")
-                        except Exception as e:
-                            logger.error(f"Error deleting floating ip {ip_id}: {str(e)}")
-                            continue
-
-                # Bulk update all successfully deleted resources
-            with psycopg2.connect(**self.db_params) as conn:
-                with conn.cursor() as cur:
-                    for resource_type, resource_ids in deleted_resources.items():
-                        if resource_ids:
-                            cur.execute(f"""
-                                UPDATE {resource_type}
-                                SET system_deleted = TRUE,
-                                    updated_time = NOW()
-                                WHERE resource_id = ANY(%s)
-                            """, (resource_ids,))
-                    conn.commit()
+                    resources_by_site[item.project_site][resource_type].append(item)
+
+            # Sites are independent endpoints, so each runs its own phase
+            # pipeline in parallel; ordering is only enforced within a site
+            with ThreadPoolExecutor(max_workers=len(resources_by_site)) as pool:
+                futures = [
+                    pool.submit(self._delete_site, site, site_resources)
+                    for site, site_resources in resources_by_site.items()
+                ]
+                for future in as_completed(futures):
+                    for resource_type, ids in future.result().items():
+                        deleted_resources[resource_type].extend(ids)
+
+            # Bulk update all successfully deleted resources. The per-table
+            # UPDATEs are sent as one multi-statement batch, one round-trip,
+            # and commit together in a single transaction.
+            updates = [(table, ids) for table, ids in deleted_resources.items() if ids]
+            if updates:
+                statement = sql.SQL("; ").join([
+                    sql.SQL("""
+                        UPDATE {}
+                        SET system_deleted = TRUE,
+                            updated_time = NOW()
+                        WHERE resource_id = ANY(%s)
+                    """).format(sql.Identifier(table))
+                    for table, _ in updates
+                ])
+                with self._get_conn() as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(statement, [ids for _, ids in updates])
 
         except Exception as e:
-            logger.error(f"Error during resource deletion: {str(e)}")
+            logger.error("Error during resource deletion: %s", e)
             raise
 
 
@@ -339,20 +416,26 @@ def main():
                       default=['all'], help='Specify resource types to delete')
     parser.add_argument('--site', choices=['kvm@tacc', 'chi@tacc', 'chi@uc'],
                       help='Optional: Filter by project site')
+    parser.add_argument('--delete-concurrency', type=int, default=DEFAULT_DELETE_CONCURRENCY,
+                      help=f'Number of parallel delete calls per phase (max {MAX_DELETE_CONCURRENCY})')
     args = parser.parse_args()
 
     if args.hours < 1:
         logger.error("Hours must be a positive integer")
         sys.exit(1)
 
+    if not 1 <= args.delete_concurrency <= MAX_DELETE_CONCURRENCY:
+        logger.error("Delete concurrency must be between 1 and %d", MAX_DELETE_CONCURRENCY)
+        sys.exit(1)
+
     try:
-        cleaner = ResourceCleaner()
+        cleaner = ResourceCleaner(delete_concurrency=args.delete_concurrency)
         resource_type = ['servers', 'networks', 'routers', 'subnets', 'floating_ips'] if 'all' in args.resource_type else args.resource_type
         resources = cleaner.get_resources_to_delete(args.hours, resource_type, args.site)
         cleaner.delete_resources(resources, dry_run=args.dry_run)
         
     except Exception as e:
-        logger.error(f"Cleanup failed: {str(e)}")
+        logger.error("Cleanup failed: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":
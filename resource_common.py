@@ -0,0 +1,129 @@
+import atexit
+import functools
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Any, Dict, Tuple
+from keystoneauth1.identity import v3
+from keystoneauth1 import session
+from requests.adapters import HTTPAdapter
+
+# HTTP connection pool sizing for keystone sessions; the requests default of
+# 10 kept connections per host throttles the parallel deletes in resource_cleanup
+HTTP_POOL_CONNECTIONS = 32
+HTTP_POOL_MAXSIZE = 64
+
+# The tracker appends to its log every five minutes from cron; rotate so the
+# file doesn't grow without bound
+LOG_MAX_BYTES = 10_000_000
+LOG_BACKUP_COUNT = 3
+
+
+def configure_logging(log_file: str):
+    """Configure root logging once per process.
+
+    The scripts import each other (resource_search imports resource_tracker),
+    so only the first call installs handlers; later calls are no-ops instead
+    of attaching a second set of handlers to the same log file.
+
+    Records are handed to a QueueHandler and written by a QueueListener
+    thread, so threads that log (e.g. the parallel deletes in
+    resource_cleanup) only enqueue and never block on file or terminal I/O.
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return
+
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [
+        logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, delay=True),
+        logging.StreamHandler()
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    # Drain the queue before the interpreter exits
+    atexit.register(listener.stop)
+
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+
+
+def get_db_params() -> Dict[str, Any]:
+    """Database connection parameters from the environment"""
+    return {
+        'dbname': os.getenv('DB_NAME'),
+        'user': os.getenv('DB_USER'),
+        'password': os.getenv('DB_PASSWORD'),
+        'host': os.getenv('DB_HOST'),
+        'port': os.getenv('DB_PORT'),
+        # TCP keepalives so a connection that goes quiet while the scripts
+        # wait on OpenStack isn't dropped by a NAT or firewall, and a dead
+        # peer is noticed in about a minute instead of the OS default hours
+        'keepalives': 1,
+        'keepalives_idle': 30,
+        'keepalives_interval': 10,
+        'keepalives_count': 5
+    }
+
+
+# Keystone hostname -> project_site value
+SITE_HOSTS = {
+    'kvm.tacc.chameleoncloud.org': 'kvm@tacc',
+    'chi.tacc.chameleoncloud.org': 'chi@tacc',
+    'chi.uc.chameleoncloud.org': 'chi@uc'
+}
+
+
+@functools.lru_cache(maxsize=8)
+def get_project_site(auth_url: str) -> str:
+    """Determine the project_site based on the auth_url."""
+    for host, site in SITE_HOSTS.items():
+        if host in auth_url:
+            return site
+    raise ValueError(f"Unknown auth_url: {auth_url}")
+
+
+@functools.lru_cache(maxsize=None)
+def parse_credentials(prefix: str) -> Tuple[Tuple[str, str, str], ...]:
+    """Parse comma-separated <prefix>_AUTH_URL / _APPLICATION_CREDENTIAL_ID / _SECRET triples.
+
+    The environment is read once per prefix; the cached result is a tuple so
+    callers can't mutate it.
+    """
+    auth_urls = os.getenv(f'{prefix}_AUTH_URL', '').split(',')
+    app_cred_ids = os.getenv(f'{prefix}_APPLICATION_CREDENTIAL_ID', '').split(',')
+    app_cred_secrets = os.getenv(f'{prefix}_APPLICATION_CREDENTIAL_SECRET', '').split(',')
+
+    return tuple(
+        (auth_url.strip(), cred_id.strip(), secret.strip())
+        for auth_url, cred_id, secret in zip(auth_urls, app_cred_ids, app_cred_secrets)
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def create_session(auth_url: str, cred_id: str, secret: str) -> session.Session:
+    """Create a pooled keystone session authenticated with an application credential.
+
+    Sessions are cached per credential, so when the OS_ and BLAZAR_ settings
+    name the same credential for a site, both clients share one session,
+    token and connection pool.
+    """
+    auth = v3.ApplicationCredential(
+        auth_url=auth_url,
+        application_credential_id=cred_id,
+        application_credential_secret=secret
+    )
+    sess = session.Session(auth=auth)
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, pool_block=False)
+    sess.session.mount('http://', adapter)
+    sess.session.mount('https://', adapter)
+    # No token is requested here: search and dry-run cleanup only read the
+    # database. Callers that fan requests out over threads fetch one with
+    # sess.get_token() first so the threads don't each go to keystone.
+    return sess
@@ -1,176 +1,180 @@
+import functools
 import logging
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Tuple
 import sys
-from resource_tracker import ResourceTracker
-import os
 from dotenv import load_dotenv 
 import argparse
+from psycopg2 import sql
+from resource_common import configure_logging, get_db_params
 
 load_dotenv()
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('resource_search.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging before importing resource_tracker so search runs log to
+# resource_search.log rather than the tracker's log file
+configure_logging('resource_search.log')
+
+from resource_tracker import ResourceTracker
+
 logger = logging.getLogger(__name__)
 
-def search_resources_by_name(tracker: ResourceTracker, search_string: str, project_site: str = None) -> Dict[str, List[Dict[str, Any]]]:
+# (table, id column, name column) for every searchable resource table
+SEARCH_TABLES = [
+    ('servers', 'resource_id', 'resource_name'),
+    ('networks', 'resource_id', 'resource_name'),
+    ('routers', 'resource_id', 'resource_name'),
+    ('subnets', 'resource_id', 'resource_name'),
+    ('gpu_leases', 'lease_id', 'lease_name'),
+    ('floating_ips', 'resource_id', 'resource_name')
+]
+
+# pg_trgm can only use the name indexes (init-scripts/04) for patterns of at
+# least one full trigram; shorter substrings fall back to sequential scans
+MIN_SUBSTRING_LENGTH = 3
+
+# Rows fetched per round-trip from the server-side search cursor
+SEARCH_FETCH_SIZE = 1000
+
+def search_query(value: str) -> str:
+    """argparse type for the query string: it must contain at least one '*'-separated term"""
+    if not _split_terms(value):
+        raise argparse.ArgumentTypeError("query must contain at least one search term")
+    return value
+
+def _split_terms(search_string: str) -> List[str]:
+    """Split the search string into its non-empty '*'-separated terms"""
+    return [s.strip() for s in search_string.split('*') if s.strip()]
+
+def _short_substring_terms(terms: List[str], prefix: bool) -> List[str]:
+    """Plain substring terms too short for the trigram indexes; they still work, with a sequential scan.
+
+    Multi-word terms go through name_tsv and an anchored --prefix term through
+    the text_pattern_ops indexes, so neither has a minimum length.
+    """
+    return [
+        t for i, t in enumerate(terms)
+        if len(t.split()) == 1 and not (prefix and i == 0) and len(t) < MIN_SUBSTRING_LENGTH
+    ]
+
+def _escape_like(term: str) -> str:
+    """Escape LIKE wildcards so a term matches literally ('_' and '%' in names are common)"""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def _words_query(term: str) -> str:
+    """Turn a multi-word term into plainto_tsquery input, splitting on '-' and '_' like name_tsv does"""
+    return term.replace('-', ' ').replace('_', ' ')
+
+@functools.lru_cache(maxsize=None)
+def _build_search_query(word_terms: Tuple[bool, ...], filter_site: bool) -> sql.Composed:
+    """Compose the UNION ALL search query once per (term kinds, site filter) shape.
+
+    word_terms has one flag per search term: multi-word terms are matched
+    against the name_tsv lexemes (init-scripts/07), the rest with LIKE.
+    Table and column names go through sql.Identifier; every value is a
+    positional placeholder, repeated once per table.
+    """
+    branches = []
+    for table, id_col, name_col in SEARCH_TABLES:
+        conditions = [
+            sql.SQL("name_tsv @@ plainto_tsquery('simple', %s)") if is_words
+            else sql.SQL("{} LIKE %s").format(sql.Identifier(name_col))
+            for is_words in word_terms
+        ]
+        if filter_site:
+            conditions.append(sql.SQL("project_site = %s"))
+        # Timestamps come back as display strings, so display_resources
+        # doesn't strftime every row
+        branches.append(sql.SQL(
+            "SELECT {} AS resource_type, {}, {}, "
+            "to_char(created_time, 'YYYY-MM-DD HH24:MI:SS') AS created_time, "
+            "to_char(last_seen_time, 'YYYY-MM-DD HH24:MI:SS') AS last_seen_time, project_site "
+            "FROM {} WHERE {}"
+        ).format(
+            sql.Literal(table),
+            sql.Identifier(id_col),
+            sql.Identifier(name_col),
+            sql.Identifier(table),
+            sql.SQL(" AND ").join(conditions)
+        ))
+    return sql.SQL(" UNION ALL ").join(branches)
+
+def search_resources_by_name(tracker: ResourceTracker, search_string: str, project_site: str = None, prefix: bool = False) -> Dict[str, List[tuple]]:
     """
     Search for resources with names containing the given substrings.
-    Optionally filter by project site.
+    Optionally filter by project site, or require names to start with the first substring.
+    Each match is an (id, name, created, last seen, site) tuple, in display order.
     """
-    results = {
-        'servers': [],
-        'networks': [],
-        'routers': [],
-        'subnets': [],
-        'gpu_leases': [],
-        'floating_ips': []
-    }
+    results = {table: [] for table, _, _ in SEARCH_TABLES}
 
     # Split the search string into multiple substrings using '*' as a delimiter
-    substrings = search_string.split('*')
-    substrings = [s.strip() for s in substrings if s.strip()]  # Remove empty strings
+    substrings = _split_terms(search_string)
 
     if not substrings:
         logger.error("No valid substrings provided in the search query.")
         return results
 
-    # Prepare the project site filter condition if specified
-    site_condition = "AND project_site = %s" if project_site else ""
-    query_params = [f'%{s}%' for s in substrings]
+    short = _short_substring_terms(substrings, prefix)
+    if short:
+        logger.warning(
+            "Search terms shorter than %d characters can't use the trigram indexes and will scan every table: %s",
+            MIN_SUBSTRING_LENGTH, ', '.join(short))
+
+    # Terms containing whitespace are matched word by word, so "prod api"
+    # finds prod-api-router; single words keep substring semantics
+    word_terms = tuple(len(s.split()) > 1 for s in substrings)
+    query_params = [
+        _words_query(s) if is_words else f'%{_escape_like(s)}%'
+        for s, is_words in zip(substrings, word_terms)
+    ]
+    if prefix and not word_terms[0]:
+        # An anchored pattern can be answered by the text_pattern_ops btree
+        # indexes (init-scripts/05) instead of the trigram indexes
+        query_params[0] = f'{_escape_like(substrings[0])}%'
     if project_site:
         query_params.append(project_site)
 
+    # Every table is searched in a single UNION ALL round-trip; the
+    # resource_type column says which results bucket a row belongs to
+    query = _build_search_query(word_terms, bool(project_site))
+
     try:
-        conn = tracker.get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                # Search servers
-                cur.execute(f"""
-                    SELECT resource_id, resource_name, created_time, last_seen_time, project_site
-                    FROM servers
-                    WHERE {" AND ".join([f"resource_name LIKE %s" for _ in substrings])}
-                    {site_condition}
-                """, query_params)
-                results['servers'] = [{
-                    'resource_id': row[0],
-                    'resource_name': row[1],
-                    'created_time': row[2],
-                    'last_seen_time': row[3],
-                    'project_site': row[4]
-                } for row in cur.fetchall()]
-
-                # Search networks
-                cur.execute(f"""
-                    SELECT resource_id, resource_name, created_time, last_seen_time, project_site
-                    FROM networks
-                    WHERE {" AND ".join([f"resource_name LIKE %s" for _ in substrings])}
-                    {site_condition}
-                """, query_params)
-                results['networks'] = [{
-                    'resource_id': row[0],
-                    'resource_name': row[1],
-                    'created_time': row[2],
-                    'last_seen_time': row[3],
-                    'project_site': row[4]
-                } for row in cur.fetchall()]
-
-                # Search routers
-                cur.execute(f"""
-                    SELECT resource_id, resource_name, created_time, last_seen_time, project_site
-                    FROM routers
-                    WHERE {" AND ".join([f"resource_name LIKE %s" for _ in substrings])}
-                    {site_condition}
-                """, query_params)
-                results['routers'] = [{
-                    'resource_id': row[0],
-                    'resource_name': row[1],
-                    'created_time': row[2],
-                    'last_seen_time': row[3],
-                    'project_site': row[4]
-                } for row in cur.fetchall()]
-
-                # Search subnets
-                cur.execute(f"""
-                    SELECT resource_id, resource_name, created_time, last_seen_time, project_site
-                    FROM subnets
-                    WHERE {" AND ".join([f"resource_name LIKE %s" for _ in substrings])}
-                    {site_condition}
-                """, query_params)
-                results['subnets'] = [{
-                    'resource_id': row[0],
-                    'resource_name': row[1],
-                    'created_time': row[2],
-                    'last_seen_time': row[3],
-                    'project_site': row[4]
-                } for row in cur.fetchall()]
-
-                # Search GPU leases
-                cur.execute(f"""
-                    SELECT lease_id, lease_name, created_time, last_seen_time, project_site
-                    FROM gpu_leases
-                    WHERE {" AND ".join([f"lease_name LIKE %s" for _ in substrings])}
-                    {site_condition}
-                """, query_params)
-                results['gpu_leases'] = [{
-                    'resource_id': row[0],
-                    'resource_name': row[1],
-                    'created_time': row[2],
-                    'last_seen_time': row[3],
-                    'project_site': row[4]
-                } for row in cur.fetchall()]
-
-                # Search floating IPs
-                cur.execute(f"""
-                    SELECT resource_id, resource_name, created_time, last_seen_time, project_site
-                    FROM floating_ips
-                    WHERE {" AND ".join([f"resource_name LIKE %s" for _ in substrings])}
-                    {site_condition}
-                """, query_params)
-                results['floating_ips'] = [{
-                    'resource_id': row[0],
-                    'resource_name': row[1],
-                    'created_time': row[2],
-                    'last_seen_time': row[3],
-                    'project_site': row[4]
-                } for row in cur.fetchall()]
-
-        finally:
-            conn.close()
+        with tracker.get_db_connection() as conn:
+            # A named (server-side) cursor streams the matches in batches
+            # instead of buffering the whole result set in libpq first
+            with conn.cursor(name='resource_search') as cur:
+                cur.itersize = SEARCH_FETCH_SIZE
+                cur.execute(query, query_params * len(SEARCH_TABLES))
+
+                # Plain tuples already in display order, so neither this loop
+                # nor display_resources does per-column dict lookups
+                for row in cur:
+                    results[row[0]].append(row[1:])
 
     except Exception as e:
-        logger.error(f"Failed to search resources: {str(e)}")
+        logger.error("Failed to search resources: %s", e)
         raise
 
     return results
 
 def main():
     parser = argparse.ArgumentParser(description='Search for resources in the resource tracker')
-    parser.add_argument("query_string", type=str, help='The query string to search for (use * as delimiter for multiple terms)')
+    parser.add_argument("query_string", type=search_query, help='The query string to search for (use * as delimiter for multiple terms)')
     parser.add_argument("--site", "-s", type=str, choices=['kvm@tacc', 'chi@tacc', 'chi@uc'], 
                       help='Optional: Filter by project site (kvm@tacc, chi@tacc, or chi@uc)')
+    parser.add_argument("--prefix", "-p", action='store_true',
+                      help='Optional: Match names that start with the first term (a single word) instead of containing it')
     args = parser.parse_args()
 
-    # Database connection parameters
-    db_params = {
-        'dbname': os.getenv('DB_NAME'),
-        'user': os.getenv('DB_USER'),
-        'password': os.getenv('DB_PASSWORD'),
-        'host': os.getenv('DB_HOST'),
-        'port': os.getenv('DB_PORT')
-    }
+    # Multi-word terms are matched word by word through name_tsv, which has
+    # no notion of where in the name a word sits
+    if args.prefix and len(_split_terms(args.query_string)[0].split()) > 1:
+        parser.error("--prefix needs a single-word first term")
 
     # Initialize the ResourceTracker
-    tracker = ResourceTracker(db_params)
+    tracker = ResourceTracker(get_db_params())
 
     # Search for resources with optional site filter
-    results = search_resources_by_name(tracker, args.query_string, args.site)
+    results = search_resources_by_name(tracker, args.query_string, args.site, args.prefix)
 
     # Print the results
     tracker.display_resources(results)
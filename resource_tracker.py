@@ -1,658 +1,609 @@
 #!/usr/bin/env python3
 
+import atexit
+import csv
+import functools
+import io
+import json
 import logging
 import openstack
 import chi
 import psycopg2
-from psycopg2.extras import Json
+import psycopg2.pool
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from psycopg2 import sql
+from psycopg2.extras import Json, execute_values
 from datetime import datetime
-from typing import Dict, List, Any
-from keystoneauth1.identity import v3
-from keystoneauth1 import session
+from itertools import chain, islice
+from typing import Dict, List, Any, Tuple
 from openstack import connection
 from dotenv import load_dotenv
-import os 
 from tabulate import tabulate
+from resource_common import configure_logging, create_session, get_db_params, get_project_site, parse_credentials
 
 # Load environment variables from .env file
 load_dotenv()
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('resource_tracker.log'),
-        logging.StreamHandler()
-    ]
-)
+configure_logging('resource_tracker.log')
 logger = logging.getLogger(__name__)
 
+# Upper bound on pooled database connections held by a ResourceTracker
+DB_POOL_MAX_CONNECTIONS = 4
+
+# Rows per multi-row VALUES statement in the batched upserts
+UPSERT_PAGE_SIZE = 500
+
+# Rows used to size the columns before streaming a large search result table
+DISPLAY_PREVIEW_ROWS = 50
+
+# Batches at least this large are upserted through a COPY-loaded staging table
+COPY_MIN_ROWS = 50
+
+# JSONB values are only ever read back by Postgres, so drop the whitespace
+# json.dumps puts after separators by default
+_compact_dumps = functools.partial(json.dumps, separators=(',', ':'))
+
+
+def jsonb(obj: Any) -> Json:
+    """Adapt obj for a JSONB column using compact encoding"""
+    return Json(obj, dumps=_compact_dumps)
+
+
+def _copy_value(value: Any) -> Any:
+    """Render a row value as COPY CSV text; None becomes the \\N NULL marker"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, Json):
+        return value.dumps(value.adapted)
+    if isinstance(value, list):
+        # Postgres array literal with every element quoted
+        return '{' + ','.join(
+            'NULL' if item is None
+            else '"' + str(item).replace('\\', '\\\\').replace('"', '\\"') + '"'
+            for item in value
+        ) + '}'
+    return value
+
+
 class ResourceTracker:
     def __init__(self, db_params: Dict[str, str]):
         self.db_params = db_params
+        self.pg_pool = psycopg2.pool.ThreadedConnectionPool(
+            minconn=1, maxconn=DB_POOL_MAX_CONNECTIONS, **self.db_params
+        )
+        atexit.register(self.pg_pool.closeall)
         self.os_connections = {}
         self.blazar_connections = {}
         self.initialize_connections()
 
     def initialize_connections(self):
         """Initialize connections for all project sites"""
-        # Parse OpenStack credentials
-        auth_urls = os.getenv('OS_AUTH_URL', '').split(',')
-        app_cred_ids = os.getenv('OS_APPLICATION_CREDENTIAL_ID', '').split(',')
-        app_cred_secrets = os.getenv('OS_APPLICATION_CREDENTIAL_SECRET', '').split(',')
-
-        # Parse Blazar credentials
-        blazar_auth_urls = os.getenv('BLAZAR_AUTH_URL', '').split(',')
-        blazar_app_cred_ids = os.getenv('BLAZAR_APPLICATION_CREDENTIAL_ID', '').split(',')
-        blazar_app_cred_secrets = os.getenv('BLAZAR_APPLICATION_CREDENTIAL_SECRET', '').split(',')
-
         # Initialize OpenStack connections
-        for auth_url, cred_id, secret in zip(auth_urls, app_cred_ids, app_cred_secrets):
-            auth_url = auth_url.strip()
-            cred_id = cred_id.strip()
-            secret = secret.strip()
-            
-            project_site = self.get_project_site(auth_url)
-            
-            auth = v3.ApplicationCredential(
-                auth_url=auth_url,
-                application_credential_id=cred_id,
-                application_credential_secret=secret
-            )
-            sess = session.Session(auth=auth)
+        for auth_url, cred_id, secret in parse_credentials('OS'):
+            project_site = get_project_site(auth_url)
+            sess = create_session(auth_url, cred_id, secret)
             self.os_connections[project_site] = connection.Connection(session=sess)
 
         # Initialize Blazar connections
-        for auth_url, cred_id, secret in zip(blazar_auth_urls, blazar_app_cred_ids, blazar_app_cred_secrets):
-            auth_url = auth_url.strip()
-            cred_id = cred_id.strip()
-            secret = secret.strip()
-            
-            project_site = self.get_project_site(auth_url)
-            
-            auth = v3.ApplicationCredential(
-                auth_url=auth_url,
-                application_credential_id=cred_id,
-                application_credential_secret=secret
-            )
-            sess = session.Session(auth=auth)
+        for auth_url, cred_id, secret in parse_credentials('BLAZAR'):
+            project_site = get_project_site(auth_url)
+            sess = create_session(auth_url, cred_id, secret)
             self.blazar_connections[project_site] = chi.blazar(session=sess)
 
+    @contextmanager
     def get_db_connection(self):
-        """Create and return a database connection"""
-        return psycopg2.connect(**self.db_params)
-
-    def get_project_site(self, auth_url: str) -> str:
-        """Determine the project_site based on the auth_url."""
-        if 'kvm.tacc.chameleoncloud.org' in auth_url:
-            return 'kvm@tacc'
-        elif 'chi.tacc.chameleoncloud.org' in auth_url:
-            return 'chi@tacc'
-        elif 'chi.uc.chameleoncloud.org' in auth_url:
-            return 'chi@uc'
-        else:
-            raise ValueError(f"Unknown auth_url: {auth_url}")
+        """Borrow a pooled database connection, committing on success and rolling back on error"""
+        conn = self.pg_pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pg_pool.putconn(conn)
 
     def fetch_current_resources(self, project_site: str) -> Dict[str, List[Any]]:
         """Fetch all current resources from OpenStack and Blazar for a specific project site"""
         try:
             os_conn = self.os_connections.get(project_site)
             blazar_conn = self.blazar_connections.get(project_site)
-            
-            resources = {
-                'servers': list(os_conn.compute.servers()) if os_conn else [],
-                'networks': list(os_conn.network.networks()) if os_conn else [],
-                'routers': list(os_conn.network.routers()) if os_conn else [],
-                'subnets': list(os_conn.network.subnets()) if os_conn else [],
-                'floating_ips': list(os_conn.network.ips()) if os_conn else [],
-                'leases': blazar_conn.lease.list() if blazar_conn else []
+
+            fetchers = {
+                'servers': (lambda: list(os_conn.compute.servers())) if os_conn else list,
+                'networks': (lambda: list(os_conn.network.networks())) if os_conn else list,
+                'routers': (lambda: list(os_conn.network.routers())) if os_conn else list,
+                'subnets': (lambda: list(os_conn.network.subnets())) if os_conn else list,
+                'floating_ips': (lambda: list(os_conn.network.ips())) if os_conn else list,
+                'leases': blazar_conn.lease.list if blazar_conn else list
             }
-            return resources
+
+            # Authenticate once before fanning out; the auth plugin caches
+            # the token, so the concurrent first requests don't each go to
+            # keystone. A separate Blazar session only has one fetcher.
+            if os_conn:
+                os_conn.session.get_token()
+
+            # The list calls are independent HTTP requests, so issue them
+            # concurrently; the fetch takes as long as the slowest one
+            with ThreadPoolExecutor(max_workers=len(fetchers)) as pool:
+                futures = {resource_type: pool.submit(fetch) for resource_type, fetch in fetchers.items()}
+                return {resource_type: future.result() for resource_type, future in futures.items()}
         except Exception as e:
-            logger.error(f"Error fetching resources for {project_site}: {str(e)}")
+            logger.error("Error fetching resources for %s: %s", project_site, e)
             raise
     
     def update_floating_ips(self, conn, floating_ips: List[Any], current_time: datetime, project_site: str):
         """Update floating IP records in the database"""
-        try:
-            with conn.cursor() as cur:
-                # Get existing floating IP IDs
-                cur.execute("SELECT resource_id FROM floating_ips WHERE project_site = %s",(project_site, ))
-                existing_ids = {row[0] for row in cur.fetchall()}
-                
-                # Process each floating IP
-                current_ids = set()
-                for ip in floating_ips:
-                    current_ids.add(ip.id)
-                    
-                    # Prepare floating IP data
-                    ip_data = {
-                        'resource_id': ip.id,
-                        'resource_name': ip.description or ip.id,  # Use description or ID as name
-                        'status': ip.status,
-                        'created_time': ip.created_at,
-                        'updated_time': ip.updated_at,
-                        'last_seen_time': current_time,
-                        'description': ip.description or '',
-                        'floating_ip_address': ip.floating_ip_address,
-                        'fixed_ip_address': ip.fixed_ip_address or '',
-                        'project_site': project_site
-                    }
-                    
-                    if ip.id in existing_ids:
-                        # Update existing floating IP
-                        cur.execute("""
-                            UPDATE floating_ips 
-                            SET resource_name = %(resource_name)s,
-                                status = %(status)s,
-                                updated_time = %(updated_time)s,
-                                last_seen_time = %(last_seen_time)s,
-                                description = %(description)s,
-                                floating_ip_address = %(floating_ip_address)s,
-                                fixed_ip_address = %(fixed_ip_address)s
-                            WHERE resource_id = %(resource_id)s
-                        """, ip_data)
-                    else:
-                        # Insert new floating IP
-                        cur.execute("""
-                            INSERT INTO floating_ips (
-                                resource_id, resource_name, status, created_time,
-                                updated_time, last_seen_time, description,
-                                floating_ip_address, fixed_ip_address, project_site
-                            ) VALUES (
-                                %(resource_id)s, %(resource_name)s, %(status)s, %(created_time)s,
-                                %(updated_time)s, %(last_seen_time)s, %(description)s,
-                                %(floating_ip_address)s, %(fixed_ip_address)s, %(project_site)s
-                            )
-                        """, ip_data)
-                
-                # Update first_time_not_seen for floating IPs that no longer exist
-                missing_ids = existing_ids - current_ids
-                if missing_ids:
-                    cur.execute("""
-                        UPDATE floating_ips 
-                        SET first_time_not_seen = %s,
-                        user_deleted = TRUE
-                        WHERE resource_id = ANY(%s)
-                        AND first_time_not_seen IS NULL
-                    """, (current_time, list(missing_ids)))
-                
-        except Exception as e:
-            logger.error(f"Error updating floating IPs: {str(e)}")
-            raise
+        with conn.cursor() as cur:
+            # Unchanged floating IPs only need last_seen_time bumped
+            unchanged = self._touch_unchanged(
+                cur, 'floating_ips', 'resource_id', [(ip.id, ip.updated_at) for ip in floating_ips], current_time)
+
+            self._bulk_upsert(
+                cur, 'floating_ips', 'resource_id',
+                ['resource_id', 'resource_name', 'status', 'created_time', 'updated_time', 'last_seen_time',
+                 'description', 'floating_ip_address', 'fixed_ip_address', 'project_site'],
+                ['resource_name', 'status', 'updated_time', 'last_seen_time',
+                 'description', 'floating_ip_address', 'fixed_ip_address'],
+                [
+                    (
+                        ip.id,
+                        ip.description or ip.id,  # Use description or ID as name
+                        ip.status,
+                        ip.created_at,
+                        ip.updated_at,
+                        current_time,
+                        ip.description or '',
+                        ip.floating_ip_address,
+                        ip.fixed_ip_address or '',
+                        project_site
+                    )
+                    for ip in floating_ips
+                    if ip.id not in unchanged
+                ]
+            )
+
+            # Update first_time_not_seen for floating IPs that no longer exist
+            self._mark_missing(cur, 'floating_ips', current_time, project_site)
     
+    def _bulk_upsert(self, cur, table: str, key: str, columns: List[str], update_columns: List[str], rows: List[tuple]):
+        """Insert rows into table, updating update_columns where key already exists, in one batched statement"""
+        if not rows:
+            return
+
+        # On a cold start there is nothing to conflict with, so load the
+        # table with COPY instead of parsing multi-row INSERTs
+        cur.execute(sql.SQL("SELECT NOT EXISTS (SELECT 1 FROM {})").format(sql.Identifier(table)))
+        if cur.fetchone()[0]:
+            self._copy_rows(cur, table, columns, rows)
+            return
+
+        conflict = sql.SQL("ON CONFLICT ({}) DO UPDATE SET {}").format(
+            sql.Identifier(key),
+            sql.SQL(", ").join(
+                sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(column)) for column in update_columns
+            )
+        )
+        column_list = sql.SQL(", ").join(map(sql.Identifier, columns))
+
+        if len(rows) >= COPY_MIN_ROWS:
+            # Large batches are COPYed into a staging table and upserted from
+            # there in one INSERT ... SELECT. The staging table is shared by
+            # every sync of this table in the transaction, so it is truncated
+            # before each use and dropped at commit.
+            staging = f"{table}_staging"
+            cur.execute(sql.SQL("""
+                CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP;
+                TRUNCATE {staging};
+            """).format(staging=sql.Identifier(staging), table=sql.Identifier(table)))
+            self._copy_rows(cur, staging, columns, rows)
+            cur.execute(sql.SQL("INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} {conflict}").format(
+                table=sql.Identifier(table),
+                columns=column_list,
+                staging=sql.Identifier(staging),
+                conflict=conflict
+            ))
+            return
+
+        query = sql.SQL("INSERT INTO {} ({}) VALUES %s {}").format(sql.Identifier(table), column_list, conflict)
+        execute_values(cur, query, rows, page_size=UPSERT_PAGE_SIZE)
+
+    def _copy_rows(self, cur, table: str, columns: List[str], rows: List[tuple]):
+        """Bulk-load rows into an empty table with COPY ... FROM STDIN"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(value) for value in row])
+        buffer.seek(0)
+        cur.copy_expert(sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL '\\N')").format(
+            sql.Identifier(table),
+            sql.SQL(", ").join(map(sql.Identifier, columns))
+        ).as_string(cur), buffer)
+
+    def _mark_missing(self, cur, table: str, current_time: datetime, project_site: str):
+        """Set first_time_not_seen on the site's live rows that this sync didn't see.
+
+        Every resource returned by the API has just had last_seen_time set
+        to current_time (by the upsert or _touch_unchanged), so anything older
+        is gone; no list of current IDs has to be sent.
+        """
+        cur.execute(sql.SQL("""
+            UPDATE {}
+            SET first_time_not_seen = %s,
+            user_deleted = TRUE
+            WHERE project_site = %s
+            AND first_time_not_seen IS NULL
+            AND last_seen_time < %s
+        """).format(sql.Identifier(table)), (current_time, project_site, current_time))
+
+    def _touch_unchanged(self, cur, table: str, key: str, versions: List[tuple], current_time: datetime,
+                         compared: Tuple[Tuple[str, str], ...] = ()) -> set:
+        """Bump last_seen_time on rows whose stored updated_time matches, returning their keys.
+
+        versions holds (key, updated_at, *values) tuples as reported by the
+        API, with one value per (column, type) pair in compared for columns
+        that can change without the API bumping updated_at. Rows that haven't
+        changed since the last sync only need last_seen_time, so callers can
+        skip sending their full column set.
+        """
+        if not versions:
+            return set()
+        columns = [sql.Identifier(column) for column, _ in compared]
+        touched = execute_values(cur, sql.SQL("""
+            UPDATE {table} t
+            SET last_seen_time = v.seen
+            FROM (VALUES %s) AS v (id, updated, seen{value_columns})
+            WHERE t.{key} = v.id
+            AND t.updated_time IS NOT DISTINCT FROM v.updated::timestamp{value_checks}
+            RETURNING t.{key}
+        """).format(
+            table=sql.Identifier(table),
+            key=sql.Identifier(key),
+            value_columns=sql.SQL('').join(sql.SQL(', ') + column for column in columns),
+            value_checks=sql.SQL('').join(
+                sql.SQL(" AND t.{column} IS NOT DISTINCT FROM v.{column}::{type}").format(
+                    column=column, type=sql.SQL(column_type))
+                for column, (_, column_type) in zip(columns, compared)
+            )
+        ),
+            [(resource_id, updated_at, current_time, *values) for resource_id, updated_at, *values in versions],
+            page_size=UPSERT_PAGE_SIZE, fetch=True)
+        return {row[0] for row in touched}
+
     def update_servers(self, conn, servers: List[Any], current_time: datetime, project_site: str):
         """Update server records in the database"""
-        try:
-            with conn.cursor() as cur:
-                # Get existing server IDs
-                cur.execute("SELECT resource_id FROM servers WHERE project_site = %s",(project_site, ))
-                existing_ids = {row[0] for row in cur.fetchall()}
-                
-                # Process each server
-                current_ids = set()
-                for server in servers:
-                    current_ids.add(server.id)
-                    
-                    # Prepare server data
-                    server_data = {
-                        'resource_id': server.id,
-                        'resource_name': server.name,
-                        'status': server.status,
-                        'created_time': server.created_at,
-                        'updated_time': server.updated_at,
-                        'last_seen_time': current_time,
-                        'flavor': server.flavor.get('id') if server.flavor else None,
-                        'image': server.image.get('id') if server.image else None,
-                        'security_groups': [sg.get('name') for sg in server.security_groups],
-                        'addresses': Json(server.addresses),
-                        'project_site': project_site
-                    }
-                    
-                    if server.id in existing_ids:
-                        # Update existing server
-                        cur.execute("""
-                            UPDATE servers 
-                            SET resource_name = %(resource_name)s,
-                                status = %(status)s,
-                                updated_time = %(updated_time)s,
-                                last_seen_time = %(last_seen_time)s,
-                                flavor = %(flavor)s,
-                                image = %(image)s,
-                                security_groups = %(security_groups)s,
-                                addresses = %(addresses)s
-                            WHERE resource_id = %(resource_id)s
-                        """, server_data)
-                    else:
-                        # Insert new server
-                        cur.execute("""
-                            INSERT INTO servers (
-                                resource_id, resource_name, status, created_time, 
-                                updated_time, last_seen_time, flavor, image,
-                                security_groups, addresses, project_site
-                            ) VALUES (
-                                %(resource_id)s, %(resource_name)s, %(status)s, %(created_time)s,
-                                %(updated_time)s, %(last_seen_time)s, %(flavor)s, %(image)s,
-                                %(security_groups)s, %(addresses)s, %(project_site)s
-                            )
-                        """, server_data)
-                
-                # Update first_time_not_seen for servers that no longer exist
-                missing_ids = existing_ids - current_ids
-                if missing_ids:
-                    cur.execute("""
-                        UPDATE servers 
-                        SET first_time_not_seen = %s,
-                        user_deleted = TRUE
-                        WHERE resource_id = ANY(%s)
-                        AND first_time_not_seen IS NULL
-                    """, (current_time, list(missing_ids)))
-                
-        except Exception as e:
-            logger.error(f"Error updating servers: {str(e)}")
-            raise
+        with conn.cursor() as cur:
+            rows = [
+                (
+                    server.id,
+                    server.name,
+                    server.status,
+                    server.created_at,
+                    server.updated_at,
+                    current_time,
+                    server.flavor.get('id') if server.flavor else None,
+                    server.image.get('id') if server.image else None,
+                    [sg.get('name') for sg in server.security_groups],
+                    jsonb(server.addresses),
+                    project_site
+                )
+                for server in servers
+            ]
+
+            # Servers whose updated_at hasn't moved only need last_seen_time;
+            # the rest (and new servers) go through the full upsert. Nova
+            # doesn't reliably bump updated_at when a floating IP is
+            # associated or a security group added or removed, so those
+            # columns are compared as well.
+            unchanged = self._touch_unchanged(
+                cur, 'servers', 'resource_id', [(row[0], row[4], row[8], row[9]) for row in rows], current_time,
+                compared=(('security_groups', 'text[]'), ('addresses', 'jsonb')))
+
+            # created_time and project_site are only set on insert
+            self._bulk_upsert(
+                cur, 'servers', 'resource_id',
+                ['resource_id', 'resource_name', 'status', 'created_time', 'updated_time', 'last_seen_time',
+                 'flavor', 'image', 'security_groups', 'addresses', 'project_site'],
+                ['resource_name', 'status', 'updated_time', 'last_seen_time',
+                 'flavor', 'image', 'security_groups', 'addresses'],
+                [row for row in rows if row[0] not in unchanged]
+            )
+
+            # Update first_time_not_seen for servers that no longer exist
+            self._mark_missing(cur, 'servers', current_time, project_site)
 
     def update_networks(self, conn, networks: List[Any], current_time: datetime, project_site):
         """Update network records in the database"""
-        try:
-            with conn.cursor() as cur:
-                # Get existing network IDs
-                cur.execute("SELECT resource_id FROM networks WHERE project_site = %s",(project_site, ))
-                existing_ids = {row[0] for row in cur.fetchall()}
-                
-                # Process each network
-                current_ids = set()
-                for network in networks:
-                    current_ids.add(network.id)
-                    
-                    # Prepare network data
-                    network_data = {
-                        'resource_id': network.id,
-                        'resource_name': network.name,
-                        'status': network.status,
-                        'created_time': network.created_at,
-                        'updated_time': network.updated_at,
-                        'last_seen_time': current_time,
-                        'port_security_enabled': network.is_port_security_enabled,
-                        'project_site': project_site
-                    }
-                    
-                    if network.id in existing_ids:
-                        # Update existing network
-                        cur.execute("""
-                            UPDATE networks 
-                            SET resource_name = %(resource_name)s,
-                                status = %(status)s,
-                                updated_time = %(updated_time)s,
-                                last_seen_time = %(last_seen_time)s,
-                                port_security_enabled = %(port_security_enabled)s
-                            WHERE resource_id = %(resource_id)s
-                        """, network_data)
-                    else:
-                        # Insert new network
-                        cur.execute("""
-                            INSERT INTO networks (
-                                resource_id, resource_name, status, created_time,
-                                updated_time, last_seen_time, port_security_enabled, project_site
-                            ) VALUES (
-                                %(resource_id)s, %(resource_name)s, %(status)s, %(created_time)s,
-                                %(updated_time)s, %(last_seen_time)s, %(port_security_enabled)s, %(project_site)s
-                            )
-                        """, network_data)
-                
-                # Update first_time_not_seen for networks that no longer exist
-                missing_ids = existing_ids - current_ids
-                if missing_ids:
-                    cur.execute("""
-                        UPDATE networks 
-                        SET first_time_not_seen = %s,
-                        user_deleted = TRUE
-                        WHERE resource_id = ANY(%s)
-                        AND first_time_not_seen IS NULL
-                    """, (current_time, list(missing_ids)))
-                
-        except Exception as e:
-            logger.error(f"Error updating networks: {str(e)}")
-            raise
+        with conn.cursor() as cur:
+            # Unchanged networks only need last_seen_time bumped
+            unchanged = self._touch_unchanged(
+                cur, 'networks', 'resource_id', [(network.id, network.updated_at) for network in networks], current_time)
+
+            self._bulk_upsert(
+                cur, 'networks', 'resource_id',
+                ['resource_id', 'resource_name', 'status', 'created_time', 'updated_time', 'last_seen_time',
+                 'port_security_enabled', 'project_site'],
+                ['resource_name', 'status', 'updated_time', 'last_seen_time', 'port_security_enabled'],
+                [
+                    (
+                        network.id,
+                        network.name,
+                        network.status,
+                        network.created_at,
+                        network.updated_at,
+                        current_time,
+                        network.is_port_security_enabled,
+                        project_site
+                    )
+                    for network in networks
+                    if network.id not in unchanged
+                ]
+            )
+
+            # Update first_time_not_seen for networks that no longer exist
+            self._mark_missing(cur, 'networks', current_time, project_site)
 
     def update_routers(self, conn, routers: List[Any], current_time: datetime, project_site: str ):
         """Update router records in the database"""
-        try:
-            with conn.cursor() as cur:
-                # Get existing router IDs
-                cur.execute("SELECT resource_id FROM routers WHERE project_site = %s",(project_site, ))
-                existing_ids = {row[0] for row in cur.fetchall()}
-                
-                # Process each router
-                current_ids = set()
-                for router in routers:
-                    current_ids.add(router.id)
-                    
-                    # Prepare router data
-                    router_data = {
-                        'resource_id': router.id,
-                        'resource_name': router.name,
-                        'status': router.status,
-                        'created_time': router.created_at,
-                        'updated_time': router.updated_at,
-                        'last_seen_time': current_time,
-                        'external_gateway_info': Json(router.external_gateway_info),
-                        'project_site':project_site
-                    }
-                    
-                    if router.id in existing_ids:
-                        # Update existing router
-                        cur.execute("""
-                            UPDATE routers 
-                            SET resource_name = %(resource_name)s,
-                                status = %(status)s,
-                                updated_time = %(updated_time)s,
-                                last_seen_time = %(last_seen_time)s,
-                                external_gateway_info = %(external_gateway_info)s
-                            WHERE resource_id = %(resource_id)s
-                        """, router_data)
-                    else:
-                        # Insert new router
-                        cur.execute("""
-                            INSERT INTO routers (
-                                resource_id, resource_name, status, created_time,
-                                updated_time, last_seen_time, external_gateway_info, project_site
-                            ) VALUES (
-                                %(resource_id)s, %(resource_name)s, %(status)s, %(created_time)s,
-                                %(updated_time)s, %(last_seen_time)s, %(external_gateway_info)s, %(project_site)s
-                            )
-                        """, router_data)
-                
-                # Update first_time_not_seen for routers that no longer exist
-                missing_ids = existing_ids - current_ids
-                if missing_ids:
-                    cur.execute("""
-                        UPDATE routers 
-                        SET first_time_not_seen = %s,
-                        user_deleted = TRUE
-                        WHERE resource_id = ANY(%s)
-                        AND first_time_not_seen IS NULL
-                    """, (current_time, list(missing_ids)))
-                
-        except Exception as e:
-            logger.error(f"Error updating routers: {str(e)}")
-            raise
+        with conn.cursor() as cur:
+            # Skip re-serializing external_gateway_info for unchanged routers
+            unchanged = self._touch_unchanged(
+                cur, 'routers', 'resource_id', [(router.id, router.updated_at) for router in routers], current_time)
+
+            self._bulk_upsert(
+                cur, 'routers', 'resource_id',
+                ['resource_id', 'resource_name', 'status', 'created_time', 'updated_time', 'last_seen_time',
+                 'external_gateway_info', 'project_site'],
+                ['resource_name', 'status', 'updated_time', 'last_seen_time', 'external_gateway_info'],
+                [
+                    (
+                        router.id,
+                        router.name,
+                        router.status,
+                        router.created_at,
+                        router.updated_at,
+                        current_time,
+                        jsonb(router.external_gateway_info),
+                        project_site
+                    )
+                    for router in routers
+                    if router.id not in unchanged
+                ]
+            )
+
+            # Update first_time_not_seen for routers that no longer exist
+            self._mark_missing(cur, 'routers', current_time, project_site)
 
     def update_subnets(self, conn, subnets: List[Any], current_time: datetime, project_site: str):
         """Update subnet records in the database"""
-        try:
-            with conn.cursor() as cur:
-                # Get existing subnet IDs
-                cur.execute("SELECT resource_id FROM subnets WHERE project_site = %s",(project_site, ))
-                existing_ids = {row[0] for row in cur.fetchall()}
-                
-                # Process each subnet
-                current_ids = set()
-                for subnet in subnets:
-                    current_ids.add(subnet.id)
-                    
-                    # Prepare subnet data
-                    subnet_data = {
-                        'resource_id': subnet.id,
-                        'resource_name': subnet.name,
-                        'status': 'ACTIVE',  # Subnets don't typically have a status field
-                        'created_time': subnet.created_at,
-                        'updated_time': subnet.updated_at,
-                        'last_seen_time': current_time,
-                        'network_id': subnet.network_id,
-                        'allocation_pools': Json(subnet.allocation_pools),
-                        'cidr': subnet.cidr,
-                        'project_site': project_site
-                    }
-                    
-                    if subnet.id in existing_ids:
-                        # Update existing subnet
-                        cur.execute("""
-                            UPDATE subnets 
-                            SET resource_name = %(resource_name)s,
-                                status = %(status)s,
-                                updated_time = %(updated_time)s,
-                                last_seen_time = %(last_seen_time)s,
-                                network_id = %(network_id)s,
-                                allocation_pools = %(allocation_pools)s,
-                                cidr = %(cidr)s
-                            WHERE resource_id = %(resource_id)s
-                        """, subnet_data)
-                    else:
-                        # Insert new subnet
-                        cur.execute("""
-                            INSERT INTO subnets (
-                                resource_id, resource_name, status, created_time,
-                                updated_time, last_seen_time, network_id,
-                                allocation_pools, cidr, project_site
-                            ) VALUES (
-                                %(resource_id)s, %(resource_name)s, %(status)s, %(created_time)s,
-                                %(updated_time)s, %(last_seen_time)s, %(network_id)s,
-                                %(allocation_pools)s, %(cidr)s, %(project_site)s
-                            )
-                        """, subnet_data)
-                
-                # Update first_time_not_seen for subnets that no longer exist
-                missing_ids = existing_ids - current_ids
-                if missing_ids:
-                    cur.execute("""
-                        UPDATE subnets 
-                        SET first_time_not_seen = %s,
-                        user_deleted = TRUE
-                        WHERE resource_id = ANY(%s)
-                        AND first_time_not_seen IS NULL
-                    """, (current_time, list(missing_ids)))
-                
-        except Exception as e:
-            logger.error(f"Error updating subnets: {str(e)}")
-            raise
+        with conn.cursor() as cur:
+            # Skip re-serializing allocation_pools for unchanged subnets
+            unchanged = self._touch_unchanged(
+                cur, 'subnets', 'resource_id', [(subnet.id, subnet.updated_at) for subnet in subnets], current_time)
+
+            self._bulk_upsert(
+                cur, 'subnets', 'resource_id',
+                ['resource_id', 'resource_name', 'status', 'created_time', 'updated_time', 'last_seen_time',
+                 'network_id', 'allocation_pools', 'cidr', 'project_site'],
+                ['resource_name', 'status', 'updated_time', 'last_seen_time',
+                 'network_id', 'allocation_pools', 'cidr'],
+                [
+                    (
+                        subnet.id,
+                        subnet.name,
+                        'ACTIVE',  # Subnets don't typically have a status field
+                        subnet.created_at,
+                        subnet.updated_at,
+                        current_time,
+                        subnet.network_id,
+                        jsonb(subnet.allocation_pools),
+                        subnet.cidr,
+                        project_site
+                    )
+                    for subnet in subnets
+                    if subnet.id not in unchanged
+                ]
+            )
+
+            # Update first_time_not_seen for subnets that no longer exist
+            self._mark_missing(cur, 'subnets', current_time, project_site)
 
     def update_gpu_leases(self, conn, leases: List[Any], current_time: datetime, project_site: str):
         """Update GPU lease records in the database"""
+        with conn.cursor() as cur:
+            # Unchanged leases only need last_seen_time bumped
+            unchanged = self._touch_unchanged(
+                cur, 'gpu_leases', 'lease_id', [(lease['id'], lease['updated_at']) for lease in leases], current_time)
+
+            self._bulk_upsert(
+                cur, 'gpu_leases', 'lease_id',
+                ['lease_id', 'lease_name', 'user_id', 'project_id', 'start_date', 'end_date', 'status',
+                 'created_time', 'updated_time', 'degraded', 'last_seen_time', 'project_site'],
+                ['lease_name', 'status', 'start_date', 'end_date', 'updated_time', 'last_seen_time', 'degraded'],
+                [
+                    (
+                        lease['id'],
+                        lease['name'],
+                        lease['user_id'],
+                        lease['project_id'],
+                        lease['start_date'],
+                        lease['end_date'],
+                        lease['status'],
+                        lease['created_at'],
+                        lease['updated_at'],
+                        lease.get('degraded', False),
+                        current_time,
+                        project_site
+                    )
+                    for lease in leases
+                    if lease['id'] not in unchanged
+                ]
+            )
+
+            # Reservations for every lease go out in one batch, after
+            # their leases exist to satisfy the foreign key
+            self.update_gpu_lease_reservations(cur, leases, project_site)
+
+            # Update first_time_not_seen for leases that no longer exist
+            self._mark_missing(cur, 'gpu_leases', current_time, project_site)
+
+    def update_gpu_lease_reservations(self, cur, leases: List[Any], project_site: str):
+        """Update GPU lease reservation records in the database"""
+        # lease_id, resource_id, resource_type, created_time and
+        # project_site are only set on insert
+        self._bulk_upsert(
+            cur, 'gpu_lease_reservations', 'reservation_id',
+            ['reservation_id', 'lease_id', 'resource_id', 'resource_type', 'status', 'created_time',
+             'updated_time', 'missing_resources', 'resources_changed', 'resource_properties',
+             'network_id', 'project_site'],
+            ['status', 'updated_time', 'missing_resources', 'resources_changed',
+             'resource_properties', 'network_id'],
+            [
+                (
+                    reservation['id'],
+                    lease['id'],
+                    reservation['resource_id'],
+                    reservation['resource_type'],
+                    reservation['status'],
+                    reservation['created_at'],
+                    reservation['updated_at'],
+                    reservation.get('missing_resources', False),
+                    reservation.get('resources_changed', False),
+                    jsonb(reservation.get('resource_properties', {})),
+                    reservation.get('network_id'),
+                    project_site
+                )
+                for lease in leases
+                for reservation in lease['reservations']
+            ]
+        )
+    
+    def _run_updater(self, conn, label: str, updater, *args) -> bool:
+        """Run one updater inside a savepoint; on failure only its own writes are rolled back"""
+        with conn.cursor() as cur:
+            cur.execute("SAVEPOINT updater")
         try:
+            updater(conn, *args)
+        except Exception:
             with conn.cursor() as cur:
-                # Get existing lease IDs
-                cur.execute("SELECT lease_id FROM gpu_leases WHERE project_site = %s",(project_site, ))
-                existing_ids = {row[0] for row in cur.fetchall()}
-                
-                # Process each lease
-                current_ids = set()
-                for lease in leases:
-                    current_ids.add(lease['id'])
-                    
-                    # Prepare lease data
-                    lease_data = {
-                        'lease_id': lease['id'],
-                        'lease_name': lease['name'],
-                        'user_id': lease['user_id'],
-                        'project_id': lease['project_id'],
-                        'start_date': lease['start_date'],
-                        'end_date': lease['end_date'],
-                        'status': lease['status'],
-                        'created_time': lease['created_at'],
-                        'updated_time': lease['updated_at'],
-                        'degraded': lease.get('degraded', False),
-                        #'trust_id': lease.get('trust_id'),
-                        'last_seen_time': current_time,
-                        'project_site': project_site
-                    }
-                    
-                    if lease['id'] in existing_ids:
-                        # Update existing lease
-                        cur.execute("""
-                            UPDATE gpu_leases 
-                            SET lease_name = %(lease_name)s,
-                                status = %(status)s,
-                                start_date = %(start_date)s,
-                                end_date = %(end_date)s,
-                                updated_time = %(updated_time)s,
-                                last_seen_time = %(last_seen_time)s,
-                                degraded = %(degraded)s
-                            WHERE lease_id = %(lease_id)s
-                        """, lease_data)
-                    else:
-                        # Insert new lease
-                        cur.execute("""
-                            INSERT INTO gpu_leases (
-                                lease_id, lease_name, user_id, project_id,
-                                start_date, end_date, status, created_time,
-                                updated_time, degraded, last_seen_time, project_site
-                            ) VALUES (
-                                %(lease_id)s, %(lease_name)s, %(user_id)s, %(project_id)s,
-                                %(start_date)s, %(end_date)s, %(status)s, %(created_time)s,
-                                %(updated_time)s, %(degraded)s, %(last_seen_time)s, %(project_site)s
-                            )
-                        """, lease_data)
-
-                    # Process reservations for this lease
-                    self.update_gpu_lease_reservations(cur, lease['id'], lease['reservations'], current_time, project_site)
-                
-                # Update first_time_not_seen for leases that no longer exist
-                missing_ids = existing_ids - current_ids
-                if missing_ids:
-                    cur.execute("""
-                        UPDATE gpu_leases 
-                        SET first_time_not_seen = %s,
-                        user_deleted = TRUE
-                        WHERE lease_id = ANY(%s)
-                        AND first_time_not_seen IS NULL
-                    """, (current_time, list(missing_ids)))
-                
-        except Exception as e:
-            logger.error(f"Error updating GPU leases: {str(e)}")
-            raise
+                cur.execute("ROLLBACK TO SAVEPOINT updater")
+            logger.exception("Error updating %s, skipping it", label)
+            return False
+        with conn.cursor() as cur:
+            cur.execute("RELEASE SAVEPOINT updater")
+        return True
 
-    def update_gpu_lease_reservations(self, cur, lease_id: str, reservations: List[Any], current_time: datetime, project_site: str):
-        """Update GPU lease reservation records in the database"""
+    def _update_site(self, project_site: str, resources: Dict[str, List[Any]], current_time: datetime) -> List[str]:
+        """Write one site's resources in its own transaction on a pooled connection; returns the failed updaters"""
+        logger.info("Updating resources for project site: %s", project_site)
+        failed = []
+        # get_db_connection commits the site's transaction, or rolls it back
+        # if anything escapes the per-updater savepoints; that only fails
+        # this site, never the others
         try:
-            # Get existing reservation IDs for this lease
-            cur.execute("SELECT reservation_id FROM gpu_lease_reservations WHERE lease_id = %s and project_site = %s", (lease_id,project_site, ))
-            existing_ids = {row[0] for row in cur.fetchall()}
-            
-            # Process each reservation
-            current_ids = set()
-            for reservation in reservations:
-                current_ids.add(reservation['id'])
-                
-                # Prepare reservation data
-                reservation_data = {
-                    'reservation_id': reservation['id'],
-                    'lease_id': lease_id,
-                    'resource_id': reservation['resource_id'],
-                    'resource_type': reservation['resource_type'],
-                    'status': reservation['status'],
-                    'created_time': reservation['created_at'],
-                    'updated_time': reservation['updated_at'],
-                    'missing_resources': reservation.get('missing_resources', False),
-                    'resources_changed': reservation.get('resources_changed', False),
-                    'resource_properties': Json(reservation.get('resource_properties', {})),
-                    'network_id': reservation.get('network_id'),
-                    'project_site': project_site
-                    #'min_hosts': reservation.get('min', 1),
-                    #'max_hosts': reservation.get('max', 1)
-                }
-                
-                if reservation['id'] in existing_ids:
-                    # Update existing reservation
-                    cur.execute("""
-                        UPDATE gpu_lease_reservations 
-                        SET status = %(status)s,
-                            updated_time = %(updated_time)s,
-                            missing_resources = %(missing_resources)s,
-                            resources_changed = %(resources_changed)s,
-                            resource_properties = %(resource_properties)s,
-                            network_id = %(network_id)s
-                        WHERE reservation_id = %(reservation_id)s
-                    """, reservation_data)
-                else:
-                    # Insert new reservation
-                    cur.execute("""
-                        INSERT INTO gpu_lease_reservations (
-                            reservation_id, lease_id, resource_id, resource_type,
-                            status, created_time, updated_time, missing_resources,
-                            resources_changed, resource_properties, network_id, project_site
-                        ) VALUES (
-                            %(reservation_id)s, %(lease_id)s, %(resource_id)s, %(resource_type)s,
-                            %(status)s, %(created_time)s, %(updated_time)s, %(missing_resources)s,
-                            %(resources_changed)s, %(resource_properties)s, %(network_id)s, %(project_site)s
-                        )
-                    """, reservation_data)
-                
-        except Exception as e:
-            logger.error(f"Error updating GPU lease reservations: {str(e)}")
-            raise
-    
+            with self.get_db_connection() as conn:
+                # Each updater is atomic on its own, so a failure in one
+                # doesn't discard the others' progress. servers, the most
+                # contended table, goes last to hold its locks the shortest.
+                updaters = [
+                    ('networks', self.update_networks, resources['networks']),
+                    ('routers', self.update_routers, resources['routers']),
+                    ('subnets', self.update_subnets, resources['subnets']),
+                    ('floating_ips', self.update_floating_ips, resources['floating_ips']),
+                ]
+                # Update Blazar leases if available for this site
+                if project_site in self.blazar_connections:
+                    updaters.append(('gpu_leases', self.update_gpu_leases, resources['leases']))
+                updaters.append(('servers', self.update_servers, resources['servers']))
+
+                for resource_type, updater, items in updaters:
+                    label = f"{resource_type}@{project_site}"
+                    if not self._run_updater(conn, label, updater, items, current_time, project_site):
+                        failed.append(label)
+        except Exception:
+            logger.exception("Error in transaction for %s, rolled back", project_site)
+            return [project_site]
+
+        return failed
+
     def update_resources(self):
         """Main method to update all resources across all project sites"""
         current_time = datetime.now()
+
+        # Fetch every site before opening any transaction so no locks are
+        # held while waiting on OpenStack and Blazar. Sites are independent
+        # endpoints, so they are fetched concurrently.
+        sites = list(self.os_connections.keys())
+        logger.info("Fetching resources for project sites: %s", ', '.join(sites))
+        # A site whose fetch fails is skipped; the others are still written
+        failed = []
+        resources_by_site = {}
+        with ThreadPoolExecutor(max_workers=max(len(sites), 1)) as pool:
+            futures = {site: pool.submit(self.fetch_current_resources, site) for site in sites}
+            for site, future in futures.items():
+                try:
+                    resources_by_site[site] = future.result()
+                except Exception:
+                    # fetch_current_resources has already logged the error
+                    failed.append(site)
         
         try:
-            conn = self.get_db_connection()
-            conn.autocommit = False
-            
-            try:
-                # Update resources for each project site
-                for project_site in self.os_connections.keys():
-                    logger.info(f"Updating resources for project site: {project_site}")
-                    resources = self.fetch_current_resources(project_site)
-                    
-                    # Update each resource type with project_site
-                    self.update_servers(conn, resources['servers'], current_time, project_site)
-                    self.update_networks(conn, resources['networks'], current_time, project_site)
-                    self.update_routers(conn, resources['routers'], current_time, project_site)
-                    self.update_subnets(conn, resources['subnets'], current_time, project_site)
-                    self.update_floating_ips(conn, resources['floating_ips'], current_time, project_site)
-                    
-                    # Update Blazar leases if available for this site
-                    if project_site in self.blazar_connections:
-                        self.update_gpu_leases(conn, resources['leases'], current_time, project_site)
-                
-                conn.commit()
-                logger.info("Successfully updated all resources across all project sites")
-                
-            except Exception as e:
-                conn.rollback()
-                logger.error(f"Error in transaction, rolling back: {str(e)}")
-                raise
-            finally:
-                conn.close()
+            # Sites only ever touch their own project_site rows, so each is
+            # written concurrently in its own transaction on its own pooled
+            # connection; workers are capped at the pool size
+            with ThreadPoolExecutor(max_workers=max(min(len(resources_by_site), DB_POOL_MAX_CONNECTIONS), 1)) as pool:
+                failed.extend(
+                    label
+                    for site_failed in pool.map(
+                        lambda site: self._update_site(site, resources_by_site[site], current_time), resources_by_site)
+                    for label in site_failed
+                )
+
+            if failed:
+                raise RuntimeError(f"Failed to update: {', '.join(failed)}")
+            logger.info("Successfully updated all resources across all project sites")
                 
         except Exception as e:
-            logger.error(f"Failed to update resources: {str(e)}")
+            logger.error("Failed to update resources: %s", e)
             raise
 
 
-    def display_resources(self, resources: Dict[str, List[Dict]]):
-        """Display given resources using tabulate"""
+    def display_resources(self, resources: Dict[str, List[tuple]]):
+        """Display given resources as grid tables, streaming rows for large result sets.
+
+        Rows are (id, name, created, last seen, site) tuples with the
+        timestamps pre-formatted, as resource_search returns them.
+        """
+        headers = ['ID', 'Name', 'Created Time', 'Last Seen Time', 'Project Site']
         for resource_type, items in resources.items():
             if items:
                 print(f"\n{resource_type.upper()} that have the query string in them:")
-                table_data = []
-                for item in items:
-                    row = [
-                        item['resource_id'],
-                        item['resource_name'],
-                        item['created_time'].strftime('%Y-%m-%d %H:%M:%S'),
-                        item['last_seen_time'].strftime('%Y-%m-%d %H:%M:%S'),
-                        item['project_site']
-                    ]
-                    table_data.append(row)
-
-                headers = ['ID', 'Name', 'Created Time', 'Last Seen Time', 'Project Site']
-                print(tabulate(table_data, headers=headers, tablefmt='grid'))
+                rows = iter(items)
+                preview = list(islice(rows, DISPLAY_PREVIEW_ROWS))
+                if len(preview) < DISPLAY_PREVIEW_ROWS:
+                    print(tabulate(preview, headers=headers, tablefmt='grid'))
+                    continue
+
+                # Too many rows to render in one string: size the columns
+                # from the preview and print the rest of the grid row by row
+                widths = [
+                    max(len(header), *(len(str(row[i])) for row in preview))
+                    for i, header in enumerate(headers)
+                ]
+                border = '+' + '+'.join('-' * (width + 2) for width in widths) + '+'
+                template = '| ' + ' | '.join(f'{{:<{width}}}' for width in widths) + ' |'
+                print(border)
+                print(template.format(*headers))
+                print(border.replace('-', '='))
+                for row in chain(preview, rows):
+                    print(template.format(*row))
+                    print(border)
     
 def main():
-    # Database connection parameters
-    db_params = {
-        'dbname': os.getenv('DB_NAME'),
-        'user': os.getenv('DB_USER'),
-        'password': os.getenv('DB_PASSWORD'),
-        'host': os.getenv('DB_HOST'),
-        'port': os.getenv('DB_PORT')
-    }
-    
-    tracker = ResourceTracker(db_params)
+    tracker = ResourceTracker(get_db_params())
     tracker.update_resources()
 
 if __name__ == "__main__":